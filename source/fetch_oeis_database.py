@@ -155,6 +155,10 @@ def safe_fetch_remote_oeis_entry(entry):
 def process_responses(db_conn, responses) -> Set[int]:
     """Process a batch of responses by updating the local SQLite database.
 
+    A batch may contain more than one response for the same OEIS ID (find_highest_valid_oeis_id may fetch an entry
+    twice). Each response is classified against the content left by the responses before it. The writes are grouped
+    per query (see below), but the end result is the same as writing the responses one by one, in order.
+
     A logging message is produced that summarizes how the batch of responses was processed.
     This function returns a set of OEIS IDs that have been successfully processed.
     """
@@ -166,8 +170,31 @@ def process_responses(db_conn, responses) -> Set[int]:
 
     processed_entries = set()
 
+    # The rows to be inserted and updated are collected per query, and written using 'executemany'.
+    #
+    # The queries are executed in a fixed order (insert, update, update t2), so the writes for a repeated OEIS ID may
+    # be reordered. An insert or content update never follows a t2-only update of the same entry, and the t2-only
+    # update never moves t2 back in time, so the result is the same as if the writes were done in order.
+
+    new_entry_rows       = []
+    updated_entry_rows   = []
+    identical_entry_rows = []
+
     with close_when_done(db_conn.cursor()) as db_cursor:
 
+        # Fetch the previous content of all entries in the batch using a single query.
+        # The number of responses is limited by the fetch batch size, which keeps the number of query parameters small.
+
+        oeis_ids = sorted({response.oeis_id for response in responses if response is not None})
+
+        query = "SELECT oeis_id, main_content, bfile_content FROM oeis_entries WHERE oeis_id IN ({});".format(",".join("?" * len(oeis_ids)))
+        db_cursor.execute(query, oeis_ids)
+
+        previous_contents = {oeis_id: (main_content, bfile_content) for (oeis_id, main_content, bfile_content) in db_cursor.fetchall()}
+
+        # The previous content is updated as each response is classified, so a later response for the same OEIS ID
+        # is compared to the content written for the earlier one.
+
         for response in responses:
 
             if response is None:
@@ -176,35 +203,37 @@ def process_responses(db_conn, responses) -> Set[int]:
                 count_failures += 1
                 continue
 
-            query = "SELECT main_content, bfile_content FROM oeis_entries WHERE oeis_id = ?;"
-            db_cursor.execute(query, (response.oeis_id, ))
-
-            previous_content = db_cursor.fetchall()
-
-            assert len(previous_content) <= 1
-            previous_content = None if len(previous_content) == 0 else previous_content[0]
+            previous_content = previous_contents.get(response.oeis_id)
 
             if previous_content is None:
                 # The oeis_id does not occur in the database yet.
                 # We will insert it as a new entry.
-                query = "INSERT INTO oeis_entries(oeis_id, t1, t2, main_content, bfile_content) VALUES (?, ?, ?, ?, ?);"
-                db_cursor.execute(query, (response.oeis_id, response.timestamp, response.timestamp, response.main_content, response.bfile_content))
+                new_entry_rows.append((response.oeis_id, response.timestamp, response.timestamp, response.main_content, response.bfile_content))
                 count_new_entries += 1
             elif previous_content != (response.main_content, response.bfile_content):
                 # The database content is stale.
                 # Update t1, t2, and content.
-                query = "UPDATE oeis_entries SET t1 = ?, t2 = ?, main_content = ?, bfile_content = ? WHERE oeis_id = ?;"
-                db_cursor.execute(query, (response.timestamp, response.timestamp, response.main_content, response.bfile_content, response.oeis_id))
+                updated_entry_rows.append((response.timestamp, response.timestamp, response.main_content, response.bfile_content, response.oeis_id))
                 count_updated_entries += 1
             else:
                 # The database content is identical to the freshly fetched content.
                 # We will just update the t2 field, indicating the fresh fetch.
-                query = "UPDATE oeis_entries SET t2 = ? WHERE oeis_id = ?;"
-                db_cursor.execute(query, (response.timestamp, response.oeis_id))
+                identical_entry_rows.append((response.timestamp, response.oeis_id))
                 count_identical_entries += 1
 
+            previous_contents[response.oeis_id] = (response.main_content, response.bfile_content)
+
             processed_entries.add(response.oeis_id)
 
+        query = "INSERT INTO oeis_entries(oeis_id, t1, t2, main_content, bfile_content) VALUES (?, ?, ?, ?, ?);"
+        db_cursor.executemany(query, new_entry_rows)
+
+        query = "UPDATE oeis_entries SET t1 = ?, t2 = ?, main_content = ?, bfile_content = ? WHERE oeis_id = ?;"
+        db_cursor.executemany(query, updated_entry_rows)
+
+        query = "UPDATE oeis_entries SET t2 = max(t2, ?) WHERE oeis_id = ?;"
+        db_cursor.executemany(query, identical_entry_rows)
+
     db_conn.commit()
 
     response_noun = "response" if len(responses) == 1 else "responses"
@@ -7,11 +7,10 @@ import argparse
 import sys
 import logging
 import sqlite3
-import concurrent.futures
 import pickle
-from typing import Tuple
+from typing import List
 
-from utilities.oeis_entry import parse_oeis_entry, OeisEntry
+from utilities.oeis_entry import parse_oeis_entries_parallel, OeisIssue
 from utilities.timer import start_timer
 from utilities.exit_scope import close_when_done
 from utilities.setup_logging import setup_logging
@@ -19,16 +18,15 @@ from utilities.setup_logging import setup_logging
 logger = logging.getLogger(__name__)
 
 
-def process_oeis_entry(oeis_entry: Tuple[int, str, str]) -> OeisEntry:
+def log_issues(oeis_id: int, issues: List[OeisIssue]) -> None:
+    """Log the issues found while parsing an OEIS entry, as a single log record.
 
-    (oeis_id, main_content, bfile_content) = oeis_entry
-
-    parsed_entry = parse_oeis_entry(
-        oeis_id, main_content, bfile_content,
-        lambda issue: logger.warning("A%06d (%s) %s", issue.oeis_id, issue.issue_type.name, issue.description)
-    )
-
-    return parsed_entry
+    The issue descriptions are only formatted if warnings are actually logged.
+    """
+    if issues and logger.isEnabledFor(logging.WARNING):
+        logger.warning("A%06d %s", oeis_id, " ".join(
+            "({}) {}".format(issue.issue_type.name, issue.description) for issue in issues
+        ))
 
 
 def process_database_entries(database_filename: str, pickle_filename: str) -> None:
@@ -38,27 +36,25 @@ def process_database_entries(database_filename: str, pickle_filename: str) -> No
         return
 
     # Fetch and process database entries, ordered by oeis_id.
+    # The entries are parsed by worker processes; their issues are logged here, in the main process.
 
     batch_size = 1000
 
     entries = []
 
     with start_timer() as timer:
-        with close_when_done(sqlite3.connect(database_filename)) as db_conn, close_when_done(db_conn.cursor()) as dbcursor_in, \
-             concurrent.futures.ProcessPoolExecutor() as pool:
+        with close_when_done(sqlite3.connect(database_filename)) as db_conn, close_when_done(db_conn.cursor()) as dbcursor_in:
 
             dbcursor_in.execute("SELECT oeis_id, main_content, bfile_content FROM oeis_entries ORDER BY oeis_id;")
 
-            while True:
+            for (parsed_entry, entry_issues) in parse_oeis_entries_parallel(dbcursor_in, batch_size=batch_size):
 
-                oeis_entries = dbcursor_in.fetchmany(batch_size)
-                if len(oeis_entries) == 0:
-                    break
+                log_issues(parsed_entry.oeis_id, entry_issues)
 
-                logger.log(logging.PROGRESS, "Processing OEIS entries A%06d to A%06d ...",
-                           oeis_entries[0][0], oeis_entries[-1][0])
+                entries.append(parsed_entry)
 
-                entries.extend(pool.map(process_oeis_entry, oeis_entries))
+                if len(entries) % batch_size == 0:
+                    logger.log(logging.PROGRESS, "Processed OEIS entries up to A%06d ...", parsed_entry.oeis_id)
 
         logger.info("Processed all database entries in %s.", timer.duration_string())
 
@@ -55,7 +55,7 @@ def process_database_entries(database_filename: str) -> None:
             logger.log(logging.PROGRESS, "Processing OEIS entries A%06d to A%06d ...",
                        oeis_entries[0][0], oeis_entries[-1][0])
 
-            for processed in pool.map(process_oeis_entry, oeis_entries):
+            for processed in pool.map(process_oeis_entry, oeis_entries, chunksize=64):
                 keywords.append(processed)
 
         logger.info("Processed all database entries in %s.", timer.duration_string())
@@ -11,7 +11,7 @@ import concurrent.futures
 from typing import Tuple, List
 from collections import Counter
 
-from utilities.oeis_entry import parse_oeis_entry, OeisIssue
+from utilities.oeis_entry import parse_oeis_entry, OeisIssue, issue_type_descriptions
 from utilities.timer import start_timer
 from utilities.exit_scope import close_when_done
 from utilities.setup_logging import setup_logging
@@ -57,7 +57,7 @@ def process_database_entries(database_filename: str, lint_output_filename: str)
             logger.log(logging.PROGRESS, "Processing OEIS entries A%06d to A%06d (issues found so far: %d) ...",
                        oeis_entries[0][0], oeis_entries[-1][0], len(issues))
 
-            for processed in pool.map(process_oeis_entry, oeis_entries):
+            for processed in pool.map(process_oeis_entry, oeis_entries, chunksize=64):
                 issues.extend(processed)
 
         logger.info("Processed all database entries in %s (issues found: %d).",
@@ -67,12 +67,17 @@ def process_database_entries(database_filename: str, lint_output_filename: str)
 
         logger.info("=== ISSUE TYPE COUNT REPORT ===")
         for (issue_type, count) in counter.most_common():
-            logger.info("{:6d} {:3s} - {}".format(count, issue_type.name, issue_type.value))
+            logger.info("{:6d} {:3s} - {}".format(count, issue_type.name, issue_type_descriptions[issue_type]))
         logger.info("=== END OF ISSUE TYPE COUNT REPORT ===")
 
         with open(lint_output_filename, "w") as fo:
+            # The issues of an entry are adjacent, so we only format the OEIS ID string once per entry.
+            oeis_id = None
             for issue in issues:
-                print("A{:06d} ({:3s}) {:s}".format(issue.oeis_id, issue.issue_type.name, issue.description), file=fo)
+                if issue.oeis_id != oeis_id:
+                    oeis_id = issue.oeis_id
+                    oeis_id_string = "A{:06d}".format(oeis_id)
+                fo.write("{} ({:3s}) {:s}\n".format(oeis_id_string, issue.issue_type.name, issue.description))
 
         logger.info("Wrote '%s'", lint_output_filename)
 
@@ -3,7 +3,7 @@ import logging
 import glob
 import json
 from collections import OrderedDict
-from source.utilities.timer import start_timer
+from utilities.timer import start_timer
 
 logger = logging.getLogger(__name__)
 
@@ -4,59 +4,70 @@ import os
 import sys
 import sqlite3
 import logging
-import shutil
 import json
+import tarfile
+import time
+import io
 
-from source.utilities.timer import start_timer
-from source.utilities.exit_scope import close_when_done
-from source.utilities.setup_logging import setup_logging
+from utilities.timer import start_timer
+from utilities.exit_scope import close_when_done
+from utilities.setup_logging import setup_logging
 
 logger = logging.getLogger(__name__)
 
 
-def process_database_entries(database_filename_in, dirname_out):
+def add_tar_file(tar, filename, content, mtime):
+    """Add a file with the given content (a string) and modification time (an integer) to a tar archive."""
+    content = content.encode()
+    info = tarfile.TarInfo(filename)
+    info.size = len(content)
+    info.mtime = mtime
+    tar.addfile(info, io.BytesIO(content))
+
+
+def process_database_entries(database_filename_in, archive_filename_out):
 
     if not os.path.exists(database_filename_in):
         logger.critical("Database file '{}' not found! Unable to continue.".format(database_filename_in))
         return
 
-    (root, ext) = os.path.splitext(database_filename_in)
+    # The directory tree is written as a single tar archive, rather than as three small files per entry.
+    # This avoids creating over a million files and directories, which is dominated by file system overhead.
+    # The archive can be unpacked into the same directory tree that was written before.
 
-    if os.path.exists(dirname_out):
-        logger.info("Removing stale directory '{}' ...".format(dirname_out))
-        shutil.rmtree(dirname_out)
+    (dirname_out, ext) = os.path.splitext(os.path.basename(archive_filename_out))
 
-    # ========== fetch and process database entries, ordered by oeis_id.
+    os.makedirs(os.path.dirname(archive_filename_out), exist_ok=True)
 
-    BATCH_SIZE = 1000
+    # All files get the same, integer modification time. A non-integer time would make tarfile write an extended
+    # header for every file, roughly doubling the size of the archive.
 
-    with start_timer() as timer:
-        with close_when_done(sqlite3.connect(database_filename_in)) as dbconn_in, close_when_done(dbconn_in.cursor()) as dbcursor_in:
+    mtime = int(time.time())
 
-            dbcursor_in.execute("SELECT oeis_id, t1, t2, main_content, bfile_content FROM oeis_entries ORDER BY oeis_id;")
+    # ========== fetch and process database entries, ordered by oeis_id.
+
+    # The cursor is iterated directly, so no list of rows is built. Progress is reported every PROGRESS_INTERVAL rows.
 
-            while True:
+    PROGRESS_INTERVAL = 1000
 
-                oeis_entries = dbcursor_in.fetchmany(BATCH_SIZE)
-                if len(oeis_entries) == 0:
-                    break
+    with start_timer() as timer:
+        with close_when_done(sqlite3.connect(database_filename_in)) as dbconn_in, close_when_done(dbconn_in.cursor()) as dbcursor_in, \
+             tarfile.open(archive_filename_out, "w") as tar:
 
-                logger.log(logging.PROGRESS, "Processing OEIS entries A{:06} to A{:06} ...".format(oeis_entries[0][0], oeis_entries[-1][0]))
+            dbcursor_in.execute("SELECT oeis_id, t1, t2, main_content, bfile_content FROM oeis_entries ORDER BY oeis_id;")
 
-                for (oeis_id, t1, t2, main_content, bfile_content) in oeis_entries:
+            for (row_index, (oeis_id, t1, t2, main_content, bfile_content)) in enumerate(dbcursor_in):
 
-                    directory = os.path.join(dirname_out, "A{:03d}xxx".format(oeis_id // 1000), "A{:06d}".format(oeis_id))
-                    os.makedirs(directory)
+                if row_index % PROGRESS_INTERVAL == 0:
+                    logger.log(logging.PROGRESS, "Processing OEIS entries starting at A{:06} ...".format(oeis_id))
 
-                    with open(os.path.join(directory, "metadata.json"), "w") as f:
-                        metadata = [oeis_id, t1, t2]
-                        json.dump(metadata, f)
+                directory = "/".join((dirname_out, "A{:03d}xxx".format(oeis_id // 1000), "A{:06d}".format(oeis_id)))
 
-                    with open(os.path.join(directory, "main_content.txt"), "w") as f:
-                        f.write(main_content)
+                metadata = [oeis_id, t1, t2]
 
-                    with open(os.path.join(directory, "bfile_content.txt"), "w") as f:
-                        f.write(bfile_content)
+                add_tar_file(tar, directory + "/metadata.json", json.dumps(metadata), mtime)
+                add_tar_file(tar, directory + "/main_content.txt", main_content, mtime)
+                add_tar_file(tar, directory + "/bfile_content.txt", bfile_content, mtime)
 
         logger.info("Processed all database entries in {}.".format(timer.duration_string()))
 
@@ -71,10 +82,10 @@ def main():
 
     (root, ext) = os.path.splitext(os.path.basename(database_filename_in))
 
-    dirname_out = os.path.join("data", root + "_directory")
+    archive_filename_out = os.path.join("data", root + "_directory.tar")
 
     with setup_logging(None):
-        process_database_entries(database_filename_in, dirname_out)
+        process_database_entries(database_filename_in, archive_filename_out)
 
 
 if __name__ == "__main__":
@@ -8,8 +8,17 @@ with open("oeis.pickle", "rb") as f:
 
 # Note that we convert the 'value' integers to strings; this prevents them from being treated as limited-precision
 # numbers when the JSON representation is interpreted.
-
-data = [(entry.oeis_id, entry.name, entry.offset, [str(v) for v in entry.values]) for entry in entries]
+#
+# The offset is written as the list of values given in the %O directive, i.e., [offset_a] or [offset_a, offset_b].
+#
+# The JSON array is written one entry at a time, so we don't need to hold a converted copy of the entire database
+# in memory. The output is identical to what json.dump would write for the list of all entries.
 
 with open("oeis.json", "w") as f:
-    json.dump(data, f)
+    f.write("[")
+    for (entry_index, entry) in enumerate(entries):
+        if entry_index != 0:
+            f.write(", ")
+        offset = [entry.offset_a] if entry.offset_b is None else [entry.offset_a, entry.offset_b]
+        f.write(json.dumps((entry.oeis_id, entry.name, offset, list(map(str, entry.values)))))
+    f.write("]")
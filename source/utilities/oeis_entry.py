@@ -1,11 +1,14 @@
 """A module to parse a fetched OEIS entry and its associated b-file into an OeisEntry instance."""
 
+import sys
 import re
-import collections
-from enum import Enum
-from typing import NamedTuple, List, Tuple, Optional, Callable
+import itertools
+import multiprocessing
+import concurrent.futures
+from enum import IntEnum
+from typing import NamedTuple, List, Tuple, Dict, Any, Optional, Callable, Iterable, Iterator
 
-from occurring_characters import occurring_characters_per_directive as acceptable_characters
+from occurring_characters import occurring_characters_per_directive
 
 
 class OeisEntry(NamedTuple):
@@ -33,49 +36,130 @@ class OeisEntry(NamedTuple):
         return "A{:06d}".format(self.oeis_id)
 
 
-class OeisIssueType(Enum):
-    """Kinds of issues that can be detected while parsing an OEIS entry."""
-
-    P01 = "Missing %A directive."
-    P02 = "Missing %O directive."
-    P03 = "No values listed (empty %S directive)."
-    P04 = "The %O directive only has a single value."
-    P05 = "Value mismatch between main file and b-file."
-    P06 = "The first index claimed by the %O directive doesn't correspond to the first index in the b-file."
-    P07 = "The main file has more values than b-file."
-    P08 = "The b-file has indexes that are non-sequential."
-    P09 = "The first index where the %O directive claims that magnitude exceeds 1 is not consistent with the values."
-    P10 = "Unacceptable characters in value of directive."
-    P11 = "Keyword occurs multiple times in %K directive value."
-    P12 = "The b-file line cannot be parsed."
-    P13 = "Unexpected empty keyword in %K directive value."
-    P14 = "Unusual %I directive value."
-    P15 = "Unexpected keyword in %K directive value."
-    P16 = "The directive should have a space before the start of its value."
-    P17 = "Main content reconstruction failed."
-    P18 = "The directive has a trailing space but no value."
-    P19 = "Negative values are present, but 'sign' keyword is missing."
-    P20 = "Sequence contains extremely large values."
-    P21 = "Keywords 'tabl' and 'tabf' occur together, which should not happen."
-    P22 = "Keywords 'nice' and 'less' occur together, which should not happen."
-    P23 = "Keywords 'easy' and 'hard' occur together, which should not happen."
-    P24 = "Keywords 'nonn' and 'sign' occur together, which should not happen."
-    P25 = "Keywords 'full' and 'more' occur together, which should not happen."
-    P26 = "Keyword 'allocated' occurs in combination with other keywords, which should not happen."
-    P27 = "Keyword 'allocating' occurs in combination with other keywords, which should not happen."
-    P28 = "Keyword 'dead' occurs in combination with other keywords, which should not happen."
-    P29 = "Keyword 'recycled' occurs in combination with other keywords, which should not happen."
-    P30 = "Keyword 'nonn' or 'sign' are both absent."
-    P31 = "The entry shouldn't have a b-file that is not system-generated."
+class OeisIssueType(IntEnum):
+    """Kinds of issues that can be detected while parsing an OEIS entry.
+
+    The canonical description of each issue type is found in the 'issue_type_descriptions' dictionary.
+    """
+
+    P01 = 1
+    P02 = 2
+    P03 = 3
+    P04 = 4
+    P05 = 5
+    P06 = 6
+    P07 = 7
+    P08 = 8
+    P09 = 9
+    P10 = 10
+    P11 = 11
+    P12 = 12
+    P13 = 13
+    P14 = 14
+    P15 = 15
+    P16 = 16
+    P17 = 17
+    P18 = 18
+    P19 = 19
+    P20 = 20
+    P21 = 21
+    P22 = 22
+    P23 = 23
+    P24 = 24
+    P25 = 25
+    P26 = 26
+    P27 = 27
+    P28 = 28
+    P29 = 29
+    P30 = 30
+    P31 = 31
+
+
+issue_type_descriptions = {
+    OeisIssueType.P01: "Missing %A directive.",
+    OeisIssueType.P02: "Missing %O directive.",
+    OeisIssueType.P03: "No values listed (empty %S directive).",
+    OeisIssueType.P04: "The %O directive only has a single value.",
+    OeisIssueType.P05: "Value mismatch between main file and b-file.",
+    OeisIssueType.P06: "The first index claimed by the %O directive doesn't correspond to the first index in the b-file.",
+    OeisIssueType.P07: "The main file has more values than b-file.",
+    OeisIssueType.P08: "The b-file has indexes that are non-sequential.",
+    OeisIssueType.P09: "The first index where the %O directive claims that magnitude exceeds 1 is not consistent with the values.",
+    OeisIssueType.P10: "Unacceptable characters in value of directive.",
+    OeisIssueType.P11: "Keyword occurs multiple times in %K directive value.",
+    OeisIssueType.P12: "The b-file line cannot be parsed.",
+    OeisIssueType.P13: "Unexpected empty keyword in %K directive value.",
+    OeisIssueType.P14: "Unusual %I directive value.",
+    OeisIssueType.P15: "Unexpected keyword in %K directive value.",
+    OeisIssueType.P16: "The directive should have a space before the start of its value.",
+    OeisIssueType.P17: "Main content reconstruction failed.",
+    OeisIssueType.P18: "The directive has a trailing space but no value.",
+    OeisIssueType.P19: "Negative values are present, but 'sign' keyword is missing.",
+    OeisIssueType.P20: "Sequence contains extremely large values.",
+    OeisIssueType.P21: "Keywords 'tabl' and 'tabf' occur together, which should not happen.",
+    OeisIssueType.P22: "Keywords 'nice' and 'less' occur together, which should not happen.",
+    OeisIssueType.P23: "Keywords 'easy' and 'hard' occur together, which should not happen.",
+    OeisIssueType.P24: "Keywords 'nonn' and 'sign' occur together, which should not happen.",
+    OeisIssueType.P25: "Keywords 'full' and 'more' occur together, which should not happen.",
+    OeisIssueType.P26: "Keyword 'allocated' occurs in combination with other keywords, which should not happen.",
+    OeisIssueType.P27: "Keyword 'allocating' occurs in combination with other keywords, which should not happen.",
+    OeisIssueType.P28: "Keyword 'dead' occurs in combination with other keywords, which should not happen.",
+    OeisIssueType.P29: "Keyword 'recycled' occurs in combination with other keywords, which should not happen.",
+    OeisIssueType.P30: "Keyword 'nonn' or 'sign' are both absent.",
+    OeisIssueType.P31: "The entry shouldn't have a b-file that is not system-generated."
+}
+
 
 class OeisIssue(NamedTuple):
-    """Represents an issue found while parsing."""
+    """Represents an issue found while parsing.
+
+    The description is only formatted when it is requested, since many consumers discard most issues.
+    """
     oeis_id: int
     issue_type: OeisIssueType
-    description: str
+    description_format: str
+    description_args: tuple = ()
 
+    @property
+    def description(self) -> str:
+        return self.description_format.format(*self.description_args)
+
+# The expected order of directives is checked by a small deterministic finite automaton.
+# Its state is the most recent directive seen (initially the empty string); the table gives the directives that may
+# follow it. It accepts exactly the directive orders described by the regular expression
+# "I(?:S|ST|STU)NC*D*H*F*e*p*t*o*Y*KO?A?E*".
+#
 # Note that the %V / %W / %X directives have been retired.
-expected_directive_order = re.compile("I(?:S|ST|STU)NC*D*H*F*e*p*t*o*Y*KO?A?E*$")
+expected_directive_successors = {
+    ""  : "I",
+    "I" : "S",
+    "S" : "TN",
+    "T" : "UN",
+    "U" : "N",
+    "N" : "CDHFeptoYK",
+    "C" : "CDHFeptoYK",
+    "D" : "DHFeptoYK",
+    "H" : "HFeptoYK",
+    "F" : "FeptoYK",
+    "e" : "eptoYK",
+    "p" : "ptoYK",
+    "t" : "toYK",
+    "o" : "oYK",
+    "Y" : "YK",
+    "K" : "OAE",
+    "O" : "AE",
+    "A" : "E",
+    "E" : "E"
+}
+
+# The directive order is complete once the %K directive has been seen.
+expected_directive_final_states = frozenset("KOAE")
+
+# The directives that list the values of the sequence.
+value_directives = frozenset(("S", "T", "U"))
+
+# The prefixes of lines that start a directive; these are followed by a space and the OEIS ID.
+directive_prefixes = frozenset("%" + directive for directive in "ISTUNCDHFeptoYKOAE")
 
 identification_pattern = re.compile("[MN][0-9]{4}( [MN][0-9]{4})*$")
 
@@ -125,9 +209,58 @@ expected_keywords = [
 
 expected_keywords_set = frozenset(expected_keywords)
 
+# Each expected keyword is assigned a bit, so that a collection of keywords can be represented as an integer bitmask.
+keyword_bits = {keyword: (1 << bit_index) for (bit_index, keyword) in enumerate(expected_keywords)}
+
+# Pairs of keywords that should not occur together.
+forbidden_keyword_pairs = [
+    (OeisIssueType.P21, "tabl", "tabf"),
+    (OeisIssueType.P22, "nice", "less"),
+    (OeisIssueType.P23, "easy", "hard"),
+    (OeisIssueType.P24, "nonn", "sign"),
+    (OeisIssueType.P25, "full", "more")
+]
+
+forbidden_keyword_pair_masks = [
+    (issue_type, keyword_bits[keyword1] | keyword_bits[keyword2], keyword1, keyword2)
+    for (issue_type, keyword1, keyword2) in forbidden_keyword_pairs
+]
+
+# Keywords that should not occur in combination with any other keyword.
+exclusive_keywords = [
+    (OeisIssueType.P26, "allocated"),
+    (OeisIssueType.P27, "allocating"),
+    (OeisIssueType.P28, "dead"),
+    (OeisIssueType.P29, "recycled")
+]
+
+exclusive_keywords_mask = sum(keyword_bits[keyword] for (issue_type, keyword) in exclusive_keywords)
+
+nonn_or_sign_mask = keyword_bits["nonn"] | keyword_bits["sign"]
+
+# The following OEIS entries have a known offset_b value beyond the available values:
+offset_b_hardcoded = {
+    93957  : 343,
+    93958  : 3908,
+    216280 : 635318657,
+    216284 : 635318657,
+    327861 : 4153248
+}
+
+# The concatenated values of the %S, %T, and %U directives are a comma-separated list of integers in canonical form,
+# i.e., without leading zeros, plus signs, or negative zero. This is exactly the set of strings that survive an
+# int/str round-trip.
+value_directives_pattern = re.compile("(?:0|-?[1-9][0-9]*)(?:,(?:0|-?[1-9][0-9]*))*")
+
 # A valid b-file line is a (possible negative) index integer, followed by 1 or more tab characters, followed by
 # a (possible negative) value integer.
-bfile_line_pattern = re.compile("(-?[0-9]+)[ \t]+(-?[0-9]+)")
+#
+# The b-file is parsed as bytes rather than as a string; this avoids a lot of small string allocations.
+# Leading whitespace is matched by the pattern, so lines do not need to be stripped before matching.
+bfile_line_pattern = re.compile(rb"\s*(-?[0-9]+)[ \t]+(-?[0-9]+)")
+
+# The data lines of a well-formed b-file, joined by newlines and including a final newline.
+well_formed_bfile_data_pattern = re.compile(b"(?:[ \t]*-?[0-9]+[ \t]+-?[0-9]+[ \t]*\n)*")
 
 
 def count_digits(n: int) -> int:
@@ -139,7 +272,7 @@ def parse_optional_multiline_directive(dv, directive):
     if directive not in dv:
         return None
     else:
-        return "".join(line + "\n" for line in dv[directive])
+        return "\n".join(dv[directive]) + "\n"
 
 
 def parse_mandatory_single_line_directive(dv, directive):
@@ -181,18 +314,22 @@ def parse_value_directives(dv, directive) -> List[int]:
     if lines == "":
         return []
 
-    values = [int(value_string) for value_string in lines.split(",")]
+    if value_directives_pattern.fullmatch(lines) is None:
+        raise RuntimeError("Bad value directive.")
+
+    values = list(map(int, lines.split(",")))
 
-    assert ",".join(str(value) for value in values) == lines
     return values
 
 
 def check_keywords(oeis_id: int, keywords, found_issue: Callable[[OeisIssue], None]) -> None:
     """Check the set of keywords, looking for issues."""
 
+    keywords_set = set(keywords)
+
     # Check for unexpected keywords.
 
-    unexpected_keywords = set(keywords) - expected_keywords_set
+    unexpected_keywords = keywords_set - expected_keywords_set
 
     for unexpected_keyword in sorted(unexpected_keywords):
         if unexpected_keyword == "":
@@ -205,96 +342,94 @@ def check_keywords(oeis_id: int, keywords, found_issue: Callable[[OeisIssue], No
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P15,
-                "Unexpected keyword '{}' in %K directive value.".format(unexpected_keyword)
+                "Unexpected keyword '{}' in %K directive value.", (unexpected_keyword, )
             ))
 
     # Check for duplicate keywords.
+    # Duplicates are rare, so we only count the keywords if their number differs from the number of distinct keywords.
+
+    if len(keywords_set) != len(keywords):
+        keyword_counts = {}
+        for keyword in keywords:
+            keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
+        for (keyword, count) in keyword_counts.items():
+            if count > 1:
+                found_issue(OeisIssue(
+                    oeis_id,
+                    OeisIssueType.P11,
+                    "Keyword '{}' occurs {} times in %K directive value.", (keyword, count)
+                ))
+
+    # Represent the expected keywords as a bitmask; this turns the checks below into a handful of integer operations.
+
+    keyword_mask = 0
+    for keyword in keywords:
+        keyword_mask |= keyword_bits.get(keyword, 0)
 
-    keyword_counter = collections.Counter(keywords)
-    for (keyword, count) in keyword_counter.items():
-        if count > 1:
+    # Check forbidden combinations of keywords.
+
+    for (issue_type, pair_mask, keyword1, keyword2) in forbidden_keyword_pair_masks:
+        if keyword_mask & pair_mask == pair_mask:
             found_issue(OeisIssue(
                 oeis_id,
-                OeisIssueType.P11,
-                "Keyword '{}' occurs {} times in %K directive value.".format(keyword, count)
+                issue_type,
+                "Keywords '{}' and '{}' occur together, which should not happen.", (keyword1, keyword2)
             ))
 
-    # Check forbidden combinations of keywords.
+    # Check exclusive keywords.
 
-    if "tabl" in keywords and "tabf" in keywords:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P21,
-            "Keywords 'tabl' and 'tabf' occur together, which should not happen."
-        ))
+    if keyword_mask & exclusive_keywords_mask and len(keywords) > 1:
+        for (issue_type, keyword) in exclusive_keywords:
+            if keyword_mask & keyword_bits[keyword]:
+                found_issue(OeisIssue(
+                    oeis_id,
+                    issue_type,
+                    "Keyword '{}' occurs in combination with other keywords, which should not happen.", (keyword, )
+                ))
 
-    if "nice" in keywords and "less" in keywords:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P22,
-            "Keywords 'nice' and 'less' occur together, which should not happen."
-        ))
+    # Check presence of either 'none' or 'sign' keyword.
 
-    if "easy" in keywords and "hard" in keywords:
+    if not keyword_mask & (exclusive_keywords_mask | nonn_or_sign_mask):
         found_issue(OeisIssue(
             oeis_id,
-            OeisIssueType.P23,
-            "Keywords 'easy' and 'hard' occur together, which should not happen."
+            OeisIssueType.P30,
+            "Keyword 'nonn' or 'sign' are both absent."
         ))
 
-    if "nonn" in keywords and "sign" in keywords:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P24,
-            "Keywords 'nonn' and 'sign' occur together, which should not happen."
-        ))
 
-    if "full" in keywords and "more" in keywords:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P25,
-            "Keywords 'full' and 'more' occur together, which should not happen."
-        ))
+def parse_well_formed_bfile_lines(lines: List[bytes]) -> Optional[Tuple[Optional[int], List[int]]]:
+    """Parse the lines of a b-file in bulk, if the b-file is well-formed.
 
-    # Check exclusive keywords.
+    A well-formed b-file has only comment lines, empty lines, and lines with two integers; its indices are consecutive.
+    This covers almost all b-files. Their lines are validated by a single regular expression match, and the integers
+    are converted using 'map', so no per-line work is done at the Python level.
 
-    if "allocated" in keywords and len(keywords) > 1:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P26,
-            "Keyword 'allocated' occurs in combination with other keywords, which should not happen."
-        ))
+    If the b-file is not well-formed, None is returned. The caller should then parse the lines one by one, which
+    allows the precise issue to be reported.
+    """
 
-    if "allocating" in keywords and len(keywords) > 1:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P27,
-            "Keyword 'allocating' occurs in combination with other keywords, which should not happen."
-        ))
+    data_lines = [line for line in lines if line and line[:1] != b"#"]
 
-    if "dead" in keywords and len(keywords) > 1:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P28,
-            "Keyword 'dead' occurs in combination with other keywords, which should not happen."
-        ))
+    if len(data_lines) == 0:
+        return (None, [])
 
-    if "recycled" in keywords and len(keywords) > 1:
-        found_issue(OeisIssue(
-            oeis_id,
-            OeisIssueType.P29,
-            "Keyword 'dead' occurs in combination with other keywords, which should not happen."
-        ))
+    data = b"\n".join(data_lines) + b"\n"
 
-    # Check presence of either 'none' or 'sign' keyword.
+    if well_formed_bfile_data_pattern.fullmatch(data) is None:
+        return None
 
-    if not(("allocated" in keywords) or ("allocating" in keywords) or ("dead" in keywords) or ("recycled" in keywords)):
-        if ("nonn" not in keywords) and ("sign" not in keywords):
-            found_issue(OeisIssue(
-                oeis_id,
-                OeisIssueType.P30,
-                "Keyword 'nonn' or 'sign' are both absent."
-            ))
+    tokens = data.split()
+
+    indexes = list(map(int, tokens[0::2]))
+
+    first_index = indexes[0]
+
+    if indexes != list(range(first_index, first_index + len(indexes))):
+        return None
+
+    values = list(map(int, tokens[1::2]))
+
+    return (first_index, values)
 
 
 def parse_bfile_content(oeis_id: int, bfile_content: str, found_issue: Callable[[OeisIssue], None]) -> Tuple[Optional[int], List[int]]:
@@ -305,28 +440,35 @@ def parse_bfile_content(oeis_id: int, bfile_content: str, found_issue: Callable[
     The indices should be consecutive.
     """
 
-    lines = bfile_content.splitlines()
+    lines = bfile_content.encode().splitlines()
+
+    result = parse_well_formed_bfile_lines(lines)
+    if result is not None:
+        return result
+
+    # The b-file is not well-formed. Parse it line by line, to find the issue.
 
     indexes = []
     values  = []
 
     for (line_nr, line) in enumerate(lines, 1):
 
-        if line.startswith("#"):
-            continue
-
-        line = line.strip()
-
-        if len(line) == 0:
+        if line[:1] == b"#":
             continue
 
         match = bfile_line_pattern.match(line)
 
         if match is None:
+
+            # Empty lines and lines consisting only of whitespace are skipped.
+
+            if line.isspace() or not line:
+                continue
+
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P12,
-                "The b-file line {} cannot be parsed: '{}'.".format(line_nr, line)
+                "The b-file line {} cannot be parsed: '{}'.", (line_nr, line.strip().decode())
             ))
             break
 
@@ -337,7 +479,7 @@ def parse_bfile_content(oeis_id: int, bfile_content: str, found_issue: Callable[
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P08,
-                "The b-file line {} has indexes that are non-sequential; {} follows {}; terminating parse.".format(
+                "The b-file line {} has indexes that are non-sequential; {} follows {}; terminating parse.", (
                     line_nr, index, indexes[-1])
             ))
             break
@@ -352,6 +494,13 @@ def parse_bfile_content(oeis_id: int, bfile_content: str, found_issue: Callable[
     return (first_index, values)
 
 
+# The directives are cut from the main content at the start of lines that have been checked to start with a valid
+# directive prefix, and each of them has been checked to end with a newline character. By construction, joining them
+# back together therefore reproduces the main content exactly. Rebuilding the main content to verify this costs a full
+# copy of it for each entry, so it is only done if this flag is set, e.g. while changing the directive parser.
+verify_main_content_reconstruction = False
+
+
 def parse_main_content_directives(oeis_id: int, main_content: str) -> List[str]:
     """Split a main-content string into its constituent directives.
     
@@ -361,13 +510,24 @@ def parse_main_content_directives(oeis_id: int, main_content: str) -> List[str]:
     (2) Sometimes we see stuff that looks like a directive, but isn't.
     
     Note that the directives V/W/X are no loner used.
+
+    A directive can only start at the beginning of a line, so rather than running a regular expression over the
+    entire main content, we only look at the lines that start with a '%' character.
     """
-    directive_pattern = "^%[ISTUNCDHFeptoYKOAE] A{:06d}".format(oeis_id)
-    directive_regexp = re.compile(directive_pattern, re.MULTILINE)
+    oeis_id_string = "A{:06d}".format(oeis_id)
+    directive_oeis_id_string = " " + oeis_id_string
+
+    directive_indices = []
+    line_start = 0
+    while True:
+        if main_content[line_start:line_start + 2] in directive_prefixes and main_content.startswith(directive_oeis_id_string, line_start + 2):
+            directive_indices.append(line_start)
+        line_start = main_content.find("\n%", line_start) + 1
+        if line_start == 0:
+            break
 
-    directive_indices = [m.start() for m in directive_regexp.finditer(main_content)]
-    if directive_indices[0] != 0:
-        raise ValueError("A{:06d}: the main file doesn't start with the expected directive pattern.".format(oeis_id))
+    if len(directive_indices) == 0 or directive_indices[0] != 0:
+        raise ValueError("{}: the main file doesn't start with the expected directive pattern.".format(oeis_id_string))
 
     directive_indices = directive_indices[1:]
     directive_indices.append(len(main_content))
@@ -376,22 +536,46 @@ def parse_main_content_directives(oeis_id: int, main_content: str) -> List[str]:
     start_index = 0
     for end_index in directive_indices:
         if main_content[end_index - 1] != '\n':
-            raise vValueError("A{:06d}: a directive doesn't end with a newline character".format(oeis_id))
+            raise ValueError("{}: a directive doesn't end with a newline character".format(oeis_id_string))
         directives.append((main_content[start_index+1:start_index+2], main_content[start_index+10:end_index - 1]))
         start_index = end_index
 
-    reconstruction = "".join("%{} A{:06d}{}\n".format(directive, oeis_id, content) for (directive, content) in directives)
+    if verify_main_content_reconstruction:
+
+        reconstruction = "\n".join("%" + directive + directive_oeis_id_string + content for (directive, content) in directives) + "\n"
 
-    if reconstruction != main_content:
-        raise ValueError("A{:06d}: the main content cannot be reconstructed from its directives.".format(oeis_id))
+        if reconstruction != main_content:
+            raise ValueError("{}: the main content cannot be reconstructed from its directives.".format(oeis_id_string))
 
     return directives
 
 
-acceptable_characters = {
+# For each directive, a translation table that deletes the characters that are acceptable in its value.
+# Translating a directive value with its table leaves only the unacceptable characters; str.translate does this in a
+# single pass, without building a set of the characters in the value.
+acceptable_characters_deletion_tables = {
+    directive: str.maketrans("", "", characters) for (directive, characters) in occurring_characters_per_directive.items()
 }
 
-def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue], None]) -> Tuple:
+
+def is_expected_directive_order(directive_order: str) -> bool:
+    """Check if the directive order is as expected, using the directive order automaton."""
+
+    state = ""
+
+    for directive in directive_order:
+        if directive not in expected_directive_successors[state]:
+            return False
+        state = directive
+
+    return state in expected_directive_final_states
+
+
+def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue], None]) -> Dict[str, Any]:
+    """Parse the main content of an OEIS entry.
+
+    The result is a dictionary keyed by OeisEntry field names. Its 'values' are the values found in the main content.
+    """
 
     # The order and count of expected directives, for any given entry, is as follows:
     #
@@ -418,7 +602,7 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
 
     directive_order = "".join(directive for (directive, directive_value) in directives)
 
-    if not expected_directive_order.match(directive_order):
+    if not is_expected_directive_order(directive_order):
         raise RuntimeError("Unexpected directive order: {!r}".format(directive_order))
 
     # Collect directives
@@ -427,27 +611,47 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
 
     for (directive, value) in directives:
 
-        if directive in "STU":
+        # A non-empty directive value should start with a single space, which is not part of the value.
+        # Note that str.removeprefix returns the string itself if the prefix is absent.
+
+        if value:
+            stripped_value = value.removeprefix(" ")
+            if stripped_value is value:
+                found_issue(OeisIssue(
+                    oeis_id,
+                    OeisIssueType.P16,
+                    "The %{} directive should have a space before the start of its value.", (directive, )
+                ))
+            elif not stripped_value:
+                found_issue(OeisIssue(
+                    oeis_id,
+                    OeisIssueType.P18,
+                    "The %{} directive has a trailing space but no value.", (directive, )
+                ))
+            value = stripped_value
+
+        if directive in value_directives:
             directive = "STU"
 
-        if len(value) != 0:
-            assert value.startswith(" ")
-            value = value[1:]
-
         if directive not in dv:
             dv[directive] = []
 
         dv[directive].append(value)
 
-        #unacceptable_characters = set(value) - acceptable_characters[directive]
-        #if unacceptable_characters:
-        #    found_issue(OeisIssue(
-        #        oeis_id,
-        #        OeisIssueType.P10,
-        #        "Unacceptable characters in value of %{} directive ({!r}): {}.".format(
-        #            directive, value, ", ".join(["{!r}".format(c) for c in sorted(unacceptable_characters)])
-        #        )
-        #    ))
+        # The table of acceptable characters is generated by verify_characters.py, which omits directives that only
+        # have empty values (and starts from an empty table). Directives without an entry are not checked.
+
+        acceptable_characters_deletion_table = acceptable_characters_deletion_tables.get(directive)
+        if value and acceptable_characters_deletion_table is not None:
+            unacceptable_characters = value.translate(acceptable_characters_deletion_table)
+            if unacceptable_characters:
+                found_issue(OeisIssue(
+                    oeis_id,
+                    OeisIssueType.P10,
+                    "Unacceptable characters in value of %{} directive ({!r}): {}.", (
+                        directive, value, ", ".join(["{!r}".format(c) for c in sorted(set(unacceptable_characters))])
+                    )
+                ))
 
     # Parse all directives.
 
@@ -475,12 +679,11 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
 
     check_keywords(oeis_id, keywords, found_issue)
 
-    # Canonify keywords: remove empty keywords and duplicates. We do not sort, though.
+    # Canonify keywords: remove empty keywords and duplicates, keeping the first occurrence. We do not sort, though.
+    # The keywords are interned, so all entries parsed in the same process share a single string instance per keyword.
+    # Entries parsed by worker processes are interned again in the main process (see intern_entry_strings).
 
-    canonized_keywords = []
-    for keyword in keywords:
-        if not (keyword == "" or keyword in canonized_keywords):
-            canonized_keywords.append(keyword)
+    canonized_keywords = list(dict.fromkeys(sys.intern(keyword) for keyword in keywords if keyword != ""))
 
     # Process %I directive.
 
@@ -491,7 +694,7 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P14,
-                "Unusual %I directive value: '{}'.".format(identification)
+                "Unusual %I directive value: '{}'.", (identification, )
             ))
 
     # Process value directives (%S/%T/%U --> STU).
@@ -508,7 +711,7 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
 
     main_values = stu_values
 
-    if ("dead" not in keywords) and ("sign" not in keywords) and any(value < 0 for value in main_values):
+    if ("dead" not in keywords) and ("sign" not in keywords) and len(main_values) > 0 and min(main_values) < 0:
         found_issue(OeisIssue(
             oeis_id,
             OeisIssueType.P19,
@@ -516,12 +719,13 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
         ))
 
     if len(main_values) > 0:
-        max_digits = max(count_digits(v) for v in main_values)
+        # The value with the largest magnitude has the most digits, so only that value needs to be converted to a string.
+        max_digits = count_digits(max(max(main_values), -min(main_values)))
         if max_digits > 1000:
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P20,
-                "Sequence contains extremely large values (up to {} digits).".format(max_digits)
+                "Sequence contains extremely large values (up to {} digits).", (max_digits, )
             ))
 
     # Process %A directive.
@@ -533,6 +737,9 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
                 OeisIssueType.P01,
                 "Missing %A directive."
             ))
+    else:
+        # Many entries have the same author; share a single string instance between them (see intern_entry_strings).
+        author = sys.intern(author)
 
     # Process %O directive.
 
@@ -558,9 +765,25 @@ def parse_main_content(oeis_id, main_content, found_issue: Callable[[OeisIssue],
 
     # Return the data parsed from the main_content.
 
-    return (identification, main_values, name, comments, detailed_references, links, formulas, examples,
-            maple_programs, mathematica_programs, other_programs, cross_references, canonized_keywords,
-            offset_a, offset_b, author, extensions_and_errors)
+    return {
+        "identification"        : identification,
+        "values"                : main_values,
+        "name"                  : name,
+        "comments"              : comments,
+        "detailed_references"   : detailed_references,
+        "links"                 : links,
+        "formulas"              : formulas,
+        "examples"              : examples,
+        "maple_programs"        : maple_programs,
+        "mathematica_programs"  : mathematica_programs,
+        "other_programs"        : other_programs,
+        "cross_references"      : cross_references,
+        "keywords"              : canonized_keywords,
+        "offset_a"              : offset_a,
+        "offset_b"              : offset_b,
+        "author"                : author,
+        "extensions_and_errors" : extensions_and_errors
+    }
 
 
 def calc_lines_needed(values, max_line_length):
@@ -572,8 +795,7 @@ def calc_lines_needed(values, max_line_length):
     current_line = 1
     current_pos_in_line = 0
     for length in lengths:
-        place_on_current_line = (current_pos_in_line == 0 or current_pos_in_line + length <= max_line_length)
-        if not place_on_current_line:
+        if current_pos_in_line + length > max_line_length and current_pos_in_line != 0:
             current_line += 1
             current_pos_in_line = 0
         current_pos_in_line += length
@@ -582,10 +804,11 @@ def calc_lines_needed(values, max_line_length):
 
 def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_issue: Callable[[OeisIssue], None]) -> OeisEntry:
 
-    (identification, main_values, name, comments, detailed_references, links, formulas, examples,
-     maple_programs, mathematica_programs, other_programs, cross_references, keywords,
-     offset_a, offset_b, author, extensions_and_errors) = \
-        parse_main_content(oeis_id, main_content, found_issue)
+    main_fields = parse_main_content(oeis_id, main_content, found_issue)
+
+    main_values = main_fields["values"]
+    offset_a    = main_fields["offset_a"]
+    offset_b    = main_fields["offset_b"]
 
     (bfile_first_index, bfile_values) = parse_bfile_content(oeis_id, bfile_content, found_issue)
 
@@ -595,11 +818,19 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
         found_issue(OeisIssue(
             oeis_id,
             OeisIssueType.P07,
-            "Main file has more values than b-file (main: {}, b-file: {}).".format(
+            "Main file has more values than b-file (main: {}, b-file: {}).", (
                 len(main_values), len(bfile_values))
         ))
 
-    if all(bfile_values[i] == main_values[i] for i in range(min(len(main_values), len(bfile_values)))):
+    # Compare the shorter list to the leading part of the longer list.
+    # Only the longer list needs to be sliced; list equality is then checked in a single C-level pass.
+
+    if len(bfile_values) >= len(main_values):
+        values_consistent = (bfile_values[:len(main_values)] == main_values)
+    else:
+        values_consistent = (main_values[:len(bfile_values)] == bfile_values)
+
+    if values_consistent:
         # The values are fully consistent.
         # Use the one that has the most entries.
         values = bfile_values if len(bfile_values) > len(main_values) else main_values
@@ -607,7 +838,7 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
         found_issue(OeisIssue(
             oeis_id,
             OeisIssueType.P05,
-            "Value mismatch between main file and b-file (main: {} ; b-file: {}).".format(
+            "Value mismatch between main file and b-file (main: {} ; b-file: {}).", (
                 main_values[:10], bfile_values[:10])
         ))
 
@@ -618,11 +849,12 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
     lines_needed = calc_lines_needed(values, 90)
     if lines_needed <= 3:
         # The values can fit in the %S %T %U directives.
-        if not ("b-file synthesized from sequence entry" in bfile_content):
+        # The marker of a synthesized b-file is found in its header, so we don't need to scan the entire b-file.
+        if not ("b-file synthesized from sequence entry" in bfile_content[:512]):
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P31,
-                "A b-file is present, but the values can fit in {} lines.".format(lines_needed)
+                "A b-file is present, but the values can fit in {} lines.", (lines_needed, )
             ))
 
     if offset_a is not None:
@@ -631,27 +863,24 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P06,
-                "%O directive claims first index is {}, but b-file starts at index {}.".format(
+                "%O directive claims first index is {}, but b-file starts at index {}.", (
                     offset_a, bfile_first_index)
             ))
 
-    # The following OEIS entries have a known offset_b value beyond the available values:
-    offset_b_hardcoded = {
-        93957: 343,
-        93958: 3908,
-        216280 : 635318657,
-        216284 : 635318657,
-        327861 : 4153248
-    }
-
     expected_offset_b_value = offset_b_hardcoded.get(oeis_id)
 
-    if expected_offset_b_value is None:
-        
-        indices_where_magnitude_exceeds_one = [i for i in range(len(values)) if abs(values[i]) > 1]
+    if expected_offset_b_value is not None:
+
+        expected_offset_b_value_str = str(expected_offset_b_value)
+
+    else:
         
-        if len(indices_where_magnitude_exceeds_one) > 0:
-            expected_offset_b_value = 1 + min(indices_where_magnitude_exceeds_one)
+        # Only the first index where the magnitude exceeds 1 is needed, so we stop searching once it is found.
+
+        first_index_where_magnitude_exceeds_one = next((i for (i, value) in enumerate(values) if abs(value) > 1), None)
+
+        if first_index_where_magnitude_exceeds_one is not None:
+            expected_offset_b_value = 1 + first_index_where_magnitude_exceeds_one
             expected_offset_b_value_str = str(expected_offset_b_value)
         else:
             expected_offset_b_value = 1
@@ -662,7 +891,7 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
         found_issue(OeisIssue(
             oeis_id,
             OeisIssueType.P04,
-            "The %O directive has no second value that indicates where the sequence magnitude first exceeds 1; we'd expect that value to be {}.".format(expected_offset_b_value_str)
+            "The %O directive has no second value that indicates where the sequence magnitude first exceeds 1; we'd expect that value to be {}.", (expected_offset_b_value_str, )
         ))
 
     else:
@@ -671,11 +900,96 @@ def parse_oeis_entry(oeis_id: int, main_content: str, bfile_content: str, found_
             found_issue(OeisIssue(
                 oeis_id,
                 OeisIssueType.P09,
-                "%O directive second value claims thet the first element where magnitude exceeds 1 is at position {}, but values suggest this should be {}.".format(offset_b, expected_offset_b_value_str)
+                "%O directive second value claims thet the first element where magnitude exceeds 1 is at position {}, but values suggest this should be {}.", (offset_b, expected_offset_b_value_str)
             ))
 
-    # Return parsed values as an OeisEntry.
+    # Return parsed values as an OeisEntry, with the merged values replacing the main content values.
+
+    main_fields["values"] = values
+
+    return OeisEntry(oeis_id=oeis_id, **main_fields)
+
+
+def parse_oeis_entry_collecting_issues(oeis_entry: Tuple[int, str, str]) -> Tuple[OeisEntry, List[OeisIssue]]:
+    """Parse an (oeis_id, main_content, bfile_content) tuple, and return the parsed entry with its issues.
+
+    This function is defined at module level, so it can be executed by worker processes.
+    """
+
+    (oeis_id, main_content, bfile_content) = oeis_entry
+
+    issues = []
+
+    parsed_entry = parse_oeis_entry(oeis_id, main_content, bfile_content, issues.append)
+
+    return (parsed_entry, issues)
+
+
+def get_worker_context():
+    """Return the multiprocessing context for starting worker processes that parse OEIS entries.
+
+    Where available, workers are started by a fork server that has already imported this module, so a new worker
+    doesn't need to import it and rebuild its tables and regular expressions. Forking the main process itself would be
+    unsafe, since it may be running other threads (the process pool runs its own management thread).
+
+    Unlike forked workers, these workers don't inherit settings made at runtime by the main process, such as the
+    int/str conversion limit (see initialize_worker_process).
+
+    Where the fork server is not available, the default context is returned.
+    """
+
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context()
+
+    context = multiprocessing.get_context("forkserver")
+    context.set_forkserver_preload([__name__])
+
+    return context
+
+
+def initialize_worker_process(int_max_str_digits: Optional[int]) -> None:
+    """Apply the main process's int/str conversion limit to a worker process, if the Python version has one."""
+    if int_max_str_digits is not None:
+        sys.set_int_max_str_digits(int_max_str_digits)
+
+
+def intern_entry_strings(entry: OeisEntry) -> OeisEntry:
+    """Intern the keywords and author of an OEIS entry.
+
+    The parser interns these strings, but an entry that is returned by a worker process is unpickled in the main
+    process, and unpickling does not intern strings. Interning them again lets all entries share one string instance
+    per distinct keyword and author, which reduces memory use and the size of a pickled database.
+    """
+    keywords = [sys.intern(keyword) for keyword in entry.keywords]
+    author = None if entry.author is None else sys.intern(entry.author)
+    return entry._replace(keywords=keywords, author=author)
+
+
+def parse_oeis_entries_parallel(oeis_entries: Iterable[Tuple[int, str, str]], max_workers: Optional[int] = None,
+                                batch_size: int = 1000, chunksize: int = 64) -> Iterator[Tuple[OeisEntry, List[OeisIssue]]]:
+    """Parse (oeis_id, main_content, bfile_content) tuples using a pool of worker processes.
+
+    The parsed entries and their issues are yielded in the same order as the input tuples.
+    The keywords and authors of the parsed entries are interned in the calling process (see intern_entry_strings).
+
+    The input is consumed in batches, so an iterator over the entire database can be passed without reading all of it
+    in memory. Within a batch, entries are sent to the workers in chunks, to reduce inter-process communication.
+    """
 
-    return OeisEntry(oeis_id, identification, values, name, comments, detailed_references, links, formulas, examples,
-                     maple_programs, mathematica_programs, other_programs, cross_references, keywords,
-                     offset_a, offset_b, author, extensions_and_errors)
+    oeis_entries = iter(oeis_entries)
+
+    # Large b-file values need the increased int/str conversion limit of the main process.
+    try:
+        int_max_str_digits = sys.get_int_max_str_digits()
+    except AttributeError:
+        int_max_str_digits = None
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers, mp_context=get_worker_context(),
+                                                initializer=initialize_worker_process,
+                                                initargs=(int_max_str_digits, )) as pool:
+        while True:
+            batch = list(itertools.islice(oeis_entries, batch_size))
+            if len(batch) == 0:
+                break
+            for (parsed_entry, issues) in pool.map(parse_oeis_entry_collecting_issues, batch, chunksize=chunksize):
+                yield (intern_entry_strings(parsed_entry), issues)
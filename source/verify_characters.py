@@ -10,20 +10,43 @@ import logging
 import sqlite3
 import concurrent.futures
 import pickle
-from contextlib import redirect_stdout
-from typing import List
+from typing import List, Tuple, Dict
 
-from utilities.oeis_entry import parse_oeis_entry, parse_main_content_directives
+from utilities.oeis_entry import parse_oeis_entry, parse_main_content_directives, get_worker_context
 from utilities.timer import start_timer
 from utilities.exit_scope import close_when_done
 from utilities.setup_logging import setup_logging
-from collections import Counter
+from collections import Counter, defaultdict
 
 logger = logging.getLogger(__name__)
 
+# The %S/%T/%U directives (and the retired %V/%W/%X directives) together list the values of a sequence;
+# their characters are collected as a single group.
+directive_groups = {
+    "S": "STU", "T": "STU", "U": "STU",
+    "V": "VWX", "W": "VWX", "X": "VWX"
+}
 
-def to_characters(s: str) -> str:
-    return "".join(sorted(set(s)))
+
+def process_oeis_entry(oeis_entry: Tuple[int, str]) -> Tuple[int, Dict[str, str]]:
+    """Determine the characters that occur in the directive values of an OEIS entry, per (grouped) directive.
+
+    The leading space of the directive values is not included. Directives that only have empty values are omitted.
+
+    This function is executed by worker processes; the main process only merges the results.
+    Only the distinct characters are returned, which is much less data than the directive values themselves.
+    """
+
+    (oeis_id, main_content) = oeis_entry
+
+    directive_characters = defaultdict(set)
+
+    for (directive, content) in parse_main_content_directives(oeis_id, main_content):
+        content = content.removeprefix(" ")
+        if content:
+            directive_characters[directive_groups.get(directive, directive)].update(content)
+
+    return (oeis_id, {directive: "".join(characters) for (directive, characters) in directive_characters.items()})
 
 
 def process_database_entries(database_filename: str) -> None:
@@ -34,16 +57,41 @@ def process_database_entries(database_filename: str) -> None:
 
     # Fetch and process database entries, ordered by oeis_id.
 
-    batch_size = 1000
+    batch_size = 5000
 
     with start_timer() as timer:
 
-        directive_data = {}
+        # For each directive, map each character to a list of OEIS IDs where this directive/character combination occurs.
+        # Only the first few OEIS IDs are recorded for each combination.
+        #
+        # Each entry is processed once, and yields each character at most once per directive, so an OEIS ID cannot be
+        # added to the same list twice. A short list is therefore sufficient; it is smaller than a set.
+
+        max_oeis_entries = 10
+
+        directive_data = defaultdict(lambda: defaultdict(list))
+
+        # For each directive, the characters for which max_oeis_entries OEIS IDs have been recorded.
+        # These characters need not be looked at anymore.
+        #
+        # They are kept as a str.translate table that deletes them, so the characters that still need to be looked at
+        # are found without building a set first.
+
+        saturated_characters_deletion_tables = defaultdict(dict)
 
         with close_when_done(sqlite3.connect(database_filename)) as db_conn, close_when_done(db_conn.cursor()) as db_cursor, \
-             concurrent.futures.ProcessPoolExecutor() as pool:
+             concurrent.futures.ProcessPoolExecutor(mp_context=get_worker_context()) as pool:
+
+            # The database is only read, in a single sequential scan. Memory-mapped I/O avoids a read() system call
+            # for every page; a large page cache would not help, since every page is visited only once.
+            # SQLite limits the requested mmap size to its compile-time maximum.
 
-            db_cursor.execute("SELECT oeis_id, main_content, bfile_content FROM oeis_entries ORDER BY oeis_id;")
+            db_conn.execute("PRAGMA query_only = ON;")
+            db_conn.execute("PRAGMA mmap_size = 17179869184;")
+
+            # The b-file content is not checked (see below), so we don't fetch it.
+
+            db_cursor.execute("SELECT oeis_id, main_content FROM oeis_entries ORDER BY oeis_id;")
 
             while True:
 
@@ -54,32 +102,21 @@ def process_database_entries(database_filename: str) -> None:
                 logger.log(logging.PROGRESS, "Processing OEIS entries A%06d to A%06d ...",
                            oeis_entries[0][0], oeis_entries[-1][0])
 
-                for (oeis_id, main_content, bfile_content) in oeis_entries:
-
-                    directives = parse_main_content_directives(oeis_id, main_content)
-
-                    for (directive, content) in directives:
-                        if content.startswith(" "):
-                            content = content[1:]
-
-                        assert len(directive) == 1
-
-                        if directive in ("S", "T", "U"):
-                            directive = "STU"
-                        elif directive in ("V", "W", "X"):
-                            directive = "VWX"
+                for (oeis_id, directive_characters) in pool.map(process_oeis_entry, oeis_entries, chunksize=64):
 
-                        max_oeis_entries = 10
+                    for (directive, characters) in directive_characters.items():
 
-                        for c in set(content):
-                            if directive not in directive_data:
-                                directive_data[directive] = {}
-                            if c not in directive_data[directive]:
-                                directive_data[directive][c] = set()  # Set of OEIS IDs where this directive/character combination occurs.
-                            if len(directive_data[directive][c]) < max_oeis_entries:
-                                directive_data[directive][c].add(oeis_id)
+                        saturated_characters_deletion_table = saturated_characters_deletion_tables[directive]
+                        unsaturated_characters = characters.translate(saturated_characters_deletion_table)
+                        if unsaturated_characters:
+                            character_data = directive_data[directive]
+                            for c in unsaturated_characters:
+                                oeis_ids = character_data[c]
+                                oeis_ids.append(oeis_id)
+                                if len(oeis_ids) == max_oeis_entries:
+                                    saturated_characters_deletion_table[ord(c)] = None
 
-                    # Check b-file content
+                    # Check b-file content (disabled; to re-enable, bfile_content must be fetched as well).
 
                     #lines = bfile_content.splitlines()
 
@@ -104,25 +141,41 @@ def process_database_entries(database_filename: str) -> None:
 
         logger.info("Processed all database entries in %s.", timer.duration_string())
 
+    # The directives and their characters are sorted once, for use by both output files.
+
+    sorted_directives = sorted(directive_data)
+    sorted_characters = {directive: "".join(sorted(directive_data[directive])) for directive in sorted_directives}
+
     filename = "verify_characters_output.txt"
 
     logger.info("Writing file '%s' ...", filename)
-    
-    with open(filename, "w") as fo, redirect_stdout(fo):
-        for directive in sorted(directive_data):
-            for c in sorted(directive_data[directive]):
-                print("%{:3s}  u{:08x}  {:20s}  {}".format(directive, ord(c), repr(c), sorted(directive_data[directive][c])))
+
+    # Each output file is written using a single write.
+    #
+    # The lists of OEIS IDs need no sorting: the entries are fetched ordered by oeis_id, and pool.map returns the
+    # results in that same order, so the OEIS IDs were appended in increasing order.
+
+    lines = [
+        "%{:3s}  u{:08x}  {:20s}  {}\n".format(directive, ord(c), repr(c), directive_data[directive][c])
+        for directive in sorted_directives
+        for c in sorted_characters[directive]
+    ]
+
+    with open(filename, "w") as fo:
+        fo.write("".join(lines))
 
     filename = "occurring_characters.py"
 
     logger.info("Writing file '%s' ...", filename)
 
-    with open(filename, "w") as fo, redirect_stdout(fo):
-        print("occurring_characters_per_directive = {")
-        for (directive_index, directive) in enumerate(sorted(directive_data)):
-            seperator_comma = "," if directive_index < len(directive_data) - 1 else ""
-            print("    {:5} : {}{}".format(repr(directive), repr("".join(sorted(directive_data[directive]))), seperator_comma))
-        print("}")
+    lines = ["occurring_characters_per_directive = {\n"]
+    for (directive_index, directive) in enumerate(sorted_directives):
+        seperator_comma = "," if directive_index < len(sorted_directives) - 1 else ""
+        lines.append("    {:5} : {}{}\n".format(repr(directive), repr(sorted_characters[directive]), seperator_comma))
+    lines.append("}\n")
+
+    with open(filename, "w") as fo:
+        fo.write("".join(lines))
 
 
 def main():